@@ -5,36 +5,41 @@ import numpy as np
 from enum import Enum
 from typing import Tuple, List
 import math
+import heapq
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional, without it the pathfinding runs in pure python
+    njit = None
 
 # Return the euclidean distance between start and end
 # start: int[2], end: int[2]
-
-
 def euclidean_distance(start: List[int], end: List[int]) -> float:
-    return math.sqrt((start[0]-end[0])*(start[0]-end[0]) + (start[1]-end[1])*(start[1]-end[1]))
+    return math.hypot(start[0]-end[0], start[1]-end[1])
+
 
 # Vertical distance + Horizontal distance
+# The exact distance on an empty grid without diagonal movement
+def manhattan_distance(start: List[int], end: List[int]) -> int:
+    return abs(start[0]-end[0]) + abs(start[1]-end[1])
 
 
-# A cell for use in the A* pathfinding algorithm
-class Cell:
-    def __init__(self, position: Tuple[int, int], goal: Tuple[int, int], distance_callback, parent=None) -> None:
-        self.parent = parent
-        self.position: Tuple[int, int] = position
-        self.goal: Tuple[int, int] = goal
-        self.cost: int = 0  # AKA G
-        if parent is None:
-            self.cost = 1
-        else:
-            self.cost = parent.cost + 1
+SQRT2: float = 2 ** 0.5
+
+# The (y, x) offsets of the neighbours of a cell, with and without diagonal movement
+OFFSETS_8: Tuple[Tuple[int, int], ...] = (
+    (0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (-1, 1), (1, -1), (1, 1))
+OFFSETS_4: Tuple[Tuple[int, int], ...] = ((0, -1), (0, 1), (-1, 0), (1, 0))
 
-        self.estimated_cost_to_end: float = distance_callback(
-            position, goal)  # AKA H
 
-        self.total_cost: float = self.cost + self.estimated_cost_to_end  # AKA F
+# Straight moves for the difference in distance, diagonal moves for the rest
+# The exact distance on an empty grid with diagonal movement
+def octile_distance(start: List[int], end: List[int]) -> float:
+    dy: int = abs(start[0]-end[0])
+    dx: int = abs(start[1]-end[1])
+    return (dx + dy) + (SQRT2 - 2) * min(dx, dy)
 
-    def __eq__(self, other) -> bool:
-        return self.position == other.position
 
 # Represents colors in a way readable to pygame
 
@@ -65,6 +70,156 @@ class BOARD_STATES(Enum):
     PATH: int = 4,   # Path generated between start and end
 
 
+# The values of the enums above, looked up once so that the drawing and pathfinding code doesn't go through the enums every time
+WHITE: pygame.Color = Color.WHITE.value[0]
+BLACK: pygame.Color = Color.BLACK.value[0]
+LIGHT_BLUE: pygame.Color = Color.LIGHT_BLUE.value[0]
+RED: pygame.Color = Color.RED.value[0]
+GREEN: pygame.Color = Color.GREEN.value[0]
+
+COLOR_OFF: pygame.Color = BOARD_STATE_COLORS.OFF.value[0]
+COLOR_ON: pygame.Color = BOARD_STATE_COLORS.ON.value[0]
+COLOR_START: pygame.Color = BOARD_STATE_COLORS.START.value[0]
+COLOR_END: pygame.Color = BOARD_STATE_COLORS.END.value[0]
+COLOR_PATH: pygame.Color = BOARD_STATE_COLORS.PATH.value[0]
+
+STATE_OFF: int = BOARD_STATES.OFF.value[0]
+STATE_ON: int = BOARD_STATES.ON.value[0]
+STATE_START: int = BOARD_STATES.START.value[0]
+STATE_END: int = BOARD_STATES.END.value[0]
+STATE_PATH: int = BOARD_STATES.PATH.value[0]
+
+# Links every board state value to its color
+COLOR_BY_STATE: dict = {
+    STATE_OFF: COLOR_OFF,
+    STATE_ON: COLOR_ON,
+    STATE_START: COLOR_START,
+    STATE_END: COLOR_END,
+    STATE_PATH: COLOR_PATH,
+}
+
+
+# Runs A* pathfinding on a board of BOARD_STATES values using only numpy arrays and numbers, so that it can be compiled by numba
+# The open set is a binary heap kept in the parallel arrays heap_f and heap_pos, where a position is stored as y * width + x
+# Returns an (N, 2) array of the [y, x] positions on the path from end back to start, or an empty array if there is no path
+def astar_grid(board: np.ndarray, start_y: int, start_x: int, end_y: int, end_x: int, diagonal: bool) -> np.ndarray:
+    height, width = board.shape
+    # The first four offsets are straight moves, the last four are diagonal moves
+    offsets_y = (0, 0, -1, 1, -1, -1, 1, 1)
+    offsets_x = (-1, 1, 0, 0, -1, 1, -1, 1)
+    offset_count = 8 if diagonal else 4
+
+    g_score = np.full((height, width), np.inf)
+    closed_mask = np.zeros((height, width), dtype=np.bool_)
+    parent_y = np.full((height, width), -1, dtype=np.int32)
+    parent_x = np.full((height, width), -1, dtype=np.int32)
+
+    # Every cell is expanded at most once and pushes at most 8 children, so the heap can never outgrow this
+    heap_f = np.empty(height * width * 8 + 1)
+    heap_pos = np.empty(height * width * 8 + 1, dtype=np.int64)
+
+    g_score[start_y, start_x] = 0.0
+    heap_f[0] = 0.0
+    heap_pos[0] = start_y * width + start_x
+    heap_size = 1
+
+    found = False
+    while heap_size > 0:
+        # Pop the position with the lowest total cost, moving the last entry to the root and sifting it down
+        position = heap_pos[0]
+        heap_size -= 1
+        if heap_size > 0:
+            last_f = heap_f[heap_size]
+            last_pos = heap_pos[heap_size]
+            i = 0
+            while True:
+                child = 2 * i + 1
+                if child >= heap_size:
+                    break
+                if child + 1 < heap_size and heap_f[child + 1] < heap_f[child]:
+                    child += 1
+                if heap_f[child] >= last_f:
+                    break
+                heap_f[i] = heap_f[child]
+                heap_pos[i] = heap_pos[child]
+                i = child
+            heap_f[i] = last_f
+            heap_pos[i] = last_pos
+
+        y = position // width
+        x = position % width
+        # Stale entries for cells that were already expanded through a cheaper path are skipped
+        if closed_mask[y, x]:
+            continue
+        closed_mask[y, x] = True
+
+        if y == end_y and x == end_x:
+            found = True
+            break
+
+        for k in range(offset_count):
+            child_y = y + offsets_y[k]
+            child_x = x + offsets_x[k]
+            # Skip children that are out of bounds, walls, or already expanded
+            if child_y < 0 or child_y >= height or child_x < 0 or child_x >= width:
+                continue
+            if board[child_y, child_x] == STATE_ON or closed_mask[child_y, child_x]:
+                continue
+
+            tentative = g_score[y, x] + (SQRT2 if k >= 4 else 1.0)
+            if tentative >= g_score[child_y, child_x]:
+                continue
+            g_score[child_y, child_x] = tentative
+            parent_y[child_y, child_x] = y
+            parent_x[child_y, child_x] = x
+
+            # Octile distance with diagonal movement, manhattan distance without
+            dy = abs(child_y - end_y)
+            dx = abs(child_x - end_x)
+            if diagonal:
+                estimate = (dx + dy) + (SQRT2 - 2) * min(dx, dy)
+            else:
+                estimate = float(dx + dy)
+
+            # Push the child, sifting it up from the bottom of the heap
+            total = tentative + estimate
+            i = heap_size
+            heap_size += 1
+            while i > 0:
+                parent = (i - 1) // 2
+                if heap_f[parent] <= total:
+                    break
+                heap_f[i] = heap_f[parent]
+                heap_pos[i] = heap_pos[parent]
+                i = parent
+            heap_f[i] = total
+            heap_pos[i] = child_y * width + child_x
+
+    if not found:
+        return np.empty((0, 2), dtype=np.int32)
+
+    # Backtrace once to size the path, then again to fill it in
+    length = 1
+    y = end_y
+    x = end_x
+    while y != start_y or x != start_x:
+        y, x = parent_y[y, x], parent_x[y, x]
+        length += 1
+
+    path = np.empty((length, 2), dtype=np.int32)
+    y = end_y
+    x = end_x
+    for i in range(length):
+        path[i, 0] = y
+        path[i, 1] = x
+        y, x = parent_y[y, x], parent_x[y, x]
+    return path
+
+
+# The compiled version of astar_grid, or None if numba isn't installed
+astar_numba = njit(cache=True)(astar_grid) if njit is not None else None
+
+
 # A simple class to render a rect on a surface
 class RenderedObject:
     renderable_objects = []
@@ -80,16 +235,30 @@ class RenderedObject:
         self.width: int = rect[2]
         self.height: int = rect[3]
 
-        self.rendered_surface = pygame.Surface((self.width, self.height))
+        # Converted to the display's pixel format so that blitting it doesn't convert every pixel each frame
+        self.rendered_surface = pygame.Surface(
+            (self.width, self.height)).convert()
         self.rendered_surface.fill(self.color)
+        # The color the surface was last filled with, so it is only filled again when the color changes
+        self.last_fill_color = self.color
+        # Whether the object has changed since it was last rendered
+        self.needs_render: bool = True
 
         # A static List to track all instances of rendered object. This will be used to determine what to render in the loop
         RenderedObject.renderable_objects.append(self)
 
-    # Blits the object on top of the screen
-    def render(self) -> None:
-        self.rendered_surface.fill(self.color)
-        self.surface.blit(self.rendered_surface, (self.left, self.top))
+    # Changes the color of the object, marking it to be rendered again if it is different
+    def set_color(self, color) -> None:
+        if color != self.color:
+            self.color = color
+            self.needs_render = True
+
+    # Returns the (surface, position) pairs to blit to draw the object, so that many objects can be drawn in one blits call
+    def get_blits(self) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+        if self.color != self.last_fill_color:
+            self.rendered_surface.fill(self.color)
+            self.last_fill_color = self.color
+        return [(self.rendered_surface, (self.left, self.top))]
 
 
 # A render-able object with collision detection
@@ -102,9 +271,6 @@ class CollidableObject(RenderedObject):
     def is_colliding(self, position) -> bool:
         return position[0] >= self.left and position[0] <= self.left+self.width and position[1] >= self.top and position[1] <= self.top+self.height
 
-    def render(self) -> None:
-        RenderedObject.render(self)
-
 
 # An object with a square background, capable of rendering text
 class TextObject(RenderedObject):
@@ -113,7 +279,7 @@ class TextObject(RenderedObject):
         self.text: str = text
         self.font = font
         self.render_surface: pygame.Surface = self.font.render(
-            text, False, Color.BLACK.value[0])
+            text, False, BLACK).convert()
         self.text_size: Tuple[int, int] = self.render_surface.get_size()
         self.left_padding: int = padding[0]
         self.top_padding: int = padding[1]
@@ -126,9 +292,9 @@ class TextObject(RenderedObject):
         if self.centered_vertical and self.top_padding != 0:
             raise Exception("Text cannot be centered with padding.")
 
-    # Renders both the rect of the object and the text on top of it
-    def render(self) -> None:
-        RenderedObject.render(self)
+    # Returns the blits for both the rect of the object and the text on top of it
+    def get_blits(self) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+        blits = RenderedObject.get_blits(self)
         text_x_position: int = self.left
         # Center the text if it should be centered, otherwise add the specified padding to it. Repeat for X and Y
         if self.centered_horzontal:
@@ -142,8 +308,10 @@ class TextObject(RenderedObject):
         else:
             text_y_position += self.top_padding
 
-        # Put the text on the screen
-        screen.blit(self.render_surface, (text_x_position, text_y_position))
+        # Put the text on top of the rect
+        blits.append(
+            (self.render_surface, (text_x_position, text_y_position)))
+        return blits
 
 
 # A renderable, clickable object with text on it
@@ -161,14 +329,11 @@ class Button(CollidableObject, TextObject):
     def is_colliding(self, position) -> None:
         return CollidableObject.is_colliding(self, position)
 
-    def is_clicked(self, event) -> bool:
-        return self.is_colliding(pygame.mouse.get_pos()) and event.type == pygame.MOUSEBUTTONDOWN and event.button == 1
-
     def click(self) -> None:
         self.callback()
 
-    def render(self) -> None:
-        TextObject.render(self)
+    def get_blits(self) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+        return TextObject.get_blits(self)
 
 
 # A class to represent the grid of squares
@@ -188,6 +353,32 @@ class Board:
         # For the meanings of positions on the board, see the BOARD_STATES enum [line 28]
         self.board: np.ndarray = np.zeros((self.height, self.width), dtype=int)
         self.diagonal = True
+        # An 8 bit surface with one pixel per cell, whose palette maps every state value to its color
+        # The board is copied straight into its pixels, then scaled up to one block of pixels per cell
+        palette = [COLOR_BY_STATE[state] for state in sorted(COLOR_BY_STATE)]
+        self.palette_surface: pygame.Surface = pygame.Surface(
+            (self.width, self.height), depth=8)
+        self.palette_surface.set_palette(palette)
+        self.scaled_surface: pygame.Surface = pygame.Surface(
+            (self.width*PIXELS_PER_UNIT, self.height*PIXELS_PER_UNIT), depth=8)
+        self.scaled_surface.set_palette(palette)
+        # The cell-separating lines never change, so they are drawn once onto a transparent overlay
+        self.grid_overlay: pygame.Surface = pygame.Surface(
+            (self.width*PIXELS_PER_UNIT, self.height*PIXELS_PER_UNIT), pygame.SRCALPHA)
+        self.draw_lines(self.grid_overlay, BLACK)
+        self.grid_overlay = self.grid_overlay.convert_alpha()
+        # The [y, x] positions of the cells that have changed since they were last drawn
+        self.dirty_cells: set = set()
+        self.mark_all_dirty()
+
+    # Sets the value at an array index in the board and marks the cell to be redrawn
+    def set_cell(self, y: int, x: int, value: int) -> None:
+        self.board[y, x] = value
+        self.dirty_cells.add((y, x))
+
+    # Marks every cell to be redrawn, for when the whole board needs to be drawn again
+    def mark_all_dirty(self) -> None:
+        self.dirty_cells.update(np.ndindex(self.height, self.width))
 
     # Sets the value at a position in the board, according to a !!!PIXEL VALUE!!! (NOT AN ARRAY INDEX)
     def draw_position(self, position: Tuple[int, int], value: int) -> int:
@@ -205,17 +396,17 @@ class Board:
             self.remove_paths(message=False)
 
         # If there is already something drawn at the position, don't draw there
-        if self.board[y, x] != BOARD_STATES.OFF.value[0]:
+        if self.board[y, x] != STATE_OFF:
             return 1
 
         # If the start or end is being placed, mark their positions
-        if value == BOARD_STATES.START.value[0]:
+        if value == STATE_START:
             self.start = (y, x)
-        elif value == BOARD_STATES.END.value[0]:
+        elif value == STATE_END:
             self.end = (y, x)
 
         # Set the board at [y,x] to value
-        self.board[y, x] = value
+        self.set_cell(y, x, value)
         return 0
 
     # Replaces the value at the position with an empty space
@@ -232,13 +423,13 @@ class Board:
             return 1
 
         # If the start or end is being removed, mark that they no longer exist
-        if self.board[y, x] == BOARD_STATES.START.value[0]:
+        if self.board[y, x] == STATE_START:
             self.start = None
-        elif self.board[y, x] == BOARD_STATES.END.value[0]:
+        elif self.board[y, x] == STATE_END:
             self.end = None
 
         # If all of the previous tests are passed, set the position to empty
-        self.board[y, x] = BOARD_STATES.OFF.value[0]
+        self.set_cell(y, x, STATE_OFF)
         return 0
 
     # Draws the lines separating the cells
@@ -251,35 +442,36 @@ class Board:
             pygame.draw.line(surface, color, (0, i*PIXELS_PER_UNIT),
                              (self.width*PIXELS_PER_UNIT, i*PIXELS_PER_UNIT))
 
-    # Fills in the cells on the pygame display according to the board.board array
-    def update_display(self, surface):
-        # For every square in the board, draw a rect based on the given surface based on its value
-        for i in range(len(self.board)):
-            for j in range(len(self.board[0])):
-                if self.board[i, j] == BOARD_STATES.ON.value[0]:
-                    pygame.draw.rect(surface, BOARD_STATE_COLORS.ON.value[0], (
-                        j*PIXELS_PER_UNIT, i*PIXELS_PER_UNIT, PIXELS_PER_UNIT, PIXELS_PER_UNIT))
-                elif self.board[i, j] == BOARD_STATES.OFF.value[0]:
-                    pygame.draw.rect(surface, BOARD_STATE_COLORS.OFF.value[0], (
-                        j*PIXELS_PER_UNIT, i*PIXELS_PER_UNIT, PIXELS_PER_UNIT, PIXELS_PER_UNIT))
-                elif self.board[i, j] == BOARD_STATES.START.value[0]:
-                    pygame.draw.rect(surface, BOARD_STATE_COLORS.START.value[0], (
-                        j*PIXELS_PER_UNIT, i*PIXELS_PER_UNIT, PIXELS_PER_UNIT, PIXELS_PER_UNIT))
-                elif self.board[i, j] == BOARD_STATES.END.value[0]:
-                    pygame.draw.rect(surface, BOARD_STATE_COLORS.END.value[0], (
-                        j*PIXELS_PER_UNIT, i*PIXELS_PER_UNIT, PIXELS_PER_UNIT, PIXELS_PER_UNIT))
-                elif self.board[i, j] == BOARD_STATES.PATH.value[0]:
-                    pygame.draw.rect(surface, BOARD_STATE_COLORS.PATH.value[0], (
-                        j*PIXELS_PER_UNIT, i*PIXELS_PER_UNIT, PIXELS_PER_UNIT, PIXELS_PER_UNIT))
+    # Redraws the cells that have changed since the last call, according to the board.board array
+    # Returns the rects of the redrawn cells, so that only they need to be updated on the display
+    def update_display(self, surface) -> List[pygame.Rect]:
+        if len(self.dirty_cells) == 0:
+            return []
+
+        # Mirror the board into the palette surface (pixels are indexed [x, y]) and scale it up to the board's size
+        pixels = pygame.surfarray.pixels2d(self.palette_surface)
+        pixels[:] = self.board.T
+        del pixels
+        pygame.transform.scale(self.palette_surface,
+                               self.scaled_surface.get_size(), self.scaled_surface)
+
+        # Copy over only the cells that changed
+        rects = [pygame.Rect(x*PIXELS_PER_UNIT, y*PIXELS_PER_UNIT, PIXELS_PER_UNIT, PIXELS_PER_UNIT)
+                 for y, x in self.dirty_cells]
+        surface.blits([(self.scaled_surface, rect, rect)
+                      for rect in rects], doreturn=False)
+        self.dirty_cells.clear()
+        return rects
 
     # Removes all paths from the board
     def remove_paths(self, message=True):
         if message:
             print("Removing paths")
-        for i in range(len(self.board)):
-            for j in range(len(self.board[0])):
-                if self.board[i, j] == BOARD_STATES.PATH.value[0]:
-                    self.board[i, j] = BOARD_STATES.OFF.value[0]
+        # Clear every path cell in one pass, marking them to be redrawn
+        path_mask = self.board == STATE_PATH
+        self.board[path_mask] = STATE_OFF
+        ys, xs = np.where(path_mask)
+        self.dirty_cells.update(zip(ys.tolist(), xs.tolist()))
         self.path_drawn = False
 
     # Runs A* pathfinding and adds the path to the board. If no path is found, does nothing
@@ -295,78 +487,102 @@ class Board:
 
         print("Running pathfinding")
 
-        # An 'open array' for cells that are open to being added
-        open = [Cell(self.start, self.end, euclidean_distance)]
-        # A closed array for cells that cannot be added
-        closed = []
+        # Use the compiled search if numba is installed, otherwise fall back to the pure python one
+        if astar_numba is not None:
+            path = astar_numba(self.board.astype(np.int8), self.start[0], self.start[1],
+                               self.end[0], self.end[1], self.diagonal)
+        else:
+            path = self.find_path()
+
+        # If the path is empty, that means that no valid path was found
+        if len(path) == 0:
+            print("Failed to draw path. No path found")
+            return 1
+
+        # Edit the board, drawing the path
+        for y, x in path:
+            # Prevents the path from overriding the start and end nodes
+            if self.board[y, x] == STATE_OFF:
+                # Set the board at [current position] to the path
+                self.set_cell(y, x, STATE_PATH)
+        print("Done")
+        self.path_drawn = True
+        return 0
+
+    # Runs A* pathfinding from start to end in pure python
+    # The search state is kept in sets and dicts keyed by (y, x) position, which python can check faster than numpy arrays
+    # Returns the positions on the path from end back to start, or an empty list if there is no path
+    def find_path(self) -> List[Tuple[int, int]]:
+        # Use the tightest heuristic and the neighbours for the kind of movement allowed
+        distance_callback = octile_distance if self.diagonal else manhattan_distance
+        offsets = OFFSETS_8 if self.diagonal else OFFSETS_4
+
+        # The cost of the cheapest known path to every open cell (AKA G)
+        open_best: dict = {self.start: 0}
+        # The position every cell was reached from on its cheapest known path
+        parents: dict = {}
+        # The positions of the cells that cannot be added anymore
+        closed_positions: set = set()
+        # A mask of the walls, computed once so that checking a child is a single lookup
+        blocked = self.board == STATE_ON
+
+        # A priority queue of (total cost, position) for cells that are open to being added
+        open_heap = [(distance_callback(self.start, self.end), self.start)]
 
         # While there are still cells to check
-        while len(open) != 0:
+        while len(open_heap) != 0:
             # Set the current node to the node with the lowest predicted cost
-            current_node = min(open, key=lambda x: x.total_cost)
+            _, position = heapq.heappop(open_heap)
 
-            open.remove(current_node)
-            closed.append(current_node)
+            # The cell was already reached through a cheaper path, so this entry is stale
+            if position in closed_positions:
+                continue
+            closed_positions.add(position)
 
             # If the current node is the end:
             # we're done!
-            if current_node.position == self.end:
-                # Backtrace via current_path_item.parent, and edit the board, drawing the path
-                current_path_item = current_node
-                while current_path_item is not None:
-                    # Prevents the path from overriding the start and end nodes
-                    if self.board[current_path_item.position[0], current_path_item.position[1]] == BOARD_STATES.OFF.value[0]:
-                        # Set the board at [current position] to the path
-                        self.board[current_path_item.position[0],
-                                   current_path_item.position[1]] = BOARD_STATES.PATH.value[0]
-                    # Recurse back
-                    current_path_item = current_path_item.parent
-                print("Done")
-                self.path_drawn = True
-                return 0
+            if position == self.end:
+                # Backtrace via the parents, collecting the positions along the way
+                path = [position]
+                while position != self.start:
+                    position = parents[position]
+                    path.append(position)
+                return path
 
             # Check all adjacent spaces (depending on if diagonal spaces are enabled or not)
-            children = []
-            for offset in ([(0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (-1, 1), (1, -1), (1, 1)] if self.diagonal else [(0, -1), (0, 1), (-1, 0), (1, 0)]):
+            y, x = position
+            for dy, dx in offsets:
                 # Calculate the position of the 'child'
-                child_position = (
-                    current_node.position[0] + offset[0], current_node.position[1] + offset[1])
+                child = (y + dy, x + dx)
                 # If the child has an invalid position, skip to the next one
-                if child_position[0] >= self.height or child_position[1] >= self.width or child_position[0] < 0 or child_position[1] < 0:
+                if child[0] >= self.height or child[1] >= self.width or child[0] < 0 or child[1] < 0:
+                    continue
+
+                # If the child is a wall or has already been closed, skip to the next one
+                if blocked[child] or child in closed_positions:
                     continue
 
-                # If the child is a wall, skip to the next one
-                if self.board[child_position[0], child_position[1]] == BOARD_STATES.ON.value[0]:
+                # If the child can't be reached more cheaply through the current node, skip it
+                tentative = open_best[position] + \
+                    (SQRT2 if dy != 0 and dx != 0 else 1)
+                if tentative >= open_best.get(child, math.inf):
                     continue
 
-                # Otherwise, add the child to the children array
-                # Note that creating a cell automatically calculates its cost according to the callback [euclidean distance]
-                children.append(Cell(
-                    child_position, self.end, euclidean_distance, current_node))
-
-            # For every !valid! child
-            for child in children:
-                # Check if the child is in the closed list, and if it is, skip it
-                for closed_list_member in closed:
-                    if child == closed_list_member:
-                        break
-                else:
-                    # If a better or equal-weighted version of the child is already in the open array, skip it
-                    for open_cell in open:
-                        if child == open_cell and child.total_cost >= open_cell.total_cost:
-                            break
-                    else:
-                        # If all of the previous checks pass, add it to open
-                        open.append(child)
+                # If all of the previous checks pass, record the new path to it and add it to open
+                open_best[child] = tentative
+                parents[child] = position
+                heapq.heappush(open_heap, (tentative +
+                               distance_callback(child, self.end), child))
 
         # If the while loop ends, that means that no valid path was found
-        print("Failed to draw path. No path found")
+        return []
 
     # Resets the board
 
     def reset_board(self):
         print("Resetting board")
         self.board = np.zeros((self.height, self.width), dtype=int)
+        self.mark_all_dirty()
         self.start = None
         self.end = None
         self.placing_end = False
@@ -397,10 +613,10 @@ class Board:
     # Returns the current state of the board
     def get_state(self):
         if self.placing_start:
-            return BOARD_STATES.START.value[0]
+            return STATE_START
         if self.placing_end:
-            return BOARD_STATES.END.value[0]
-        return BOARD_STATES.ON.value[0]
+            return STATE_END
+        return STATE_ON
 
     def toggle_diagonal_movement(self):
         self.diagonal = not self.diagonal
@@ -414,6 +630,8 @@ pygame.font.init()
 
 # Globals
 PIXELS_PER_UNIT: int = 20
+# The most frames drawn per second, so an idle window doesn't spin the CPU
+FRAMES_PER_SECOND: int = 60
 SIZE = WIDTH, HEIGHT = 1200, 1000
 SIDEBAR_AREA = 300
 DRAWABLE_AREA = DRAWABLE_WIDTH, DRAWABLE_HEIGHT = WIDTH - SIDEBAR_AREA, HEIGHT
@@ -423,92 +641,134 @@ board: Board = Board(DRAWABLE_WIDTH // PIXELS_PER_UNIT,
                      DRAWABLE_HEIGHT // PIXELS_PER_UNIT)
 DEFAULT_FONT = pygame.font.SysFont("arial", 24)
 
+# Translucent overlays to tint the screen while the start or end is being placed
+START_TINT: pygame.Surface = pygame.Surface(SIZE).convert()
+START_TINT.fill(COLOR_START)
+START_TINT.set_alpha(100)
+END_TINT: pygame.Surface = pygame.Surface(SIZE).convert()
+END_TINT.fill(COLOR_END)
+END_TINT.set_alpha(100)
+
 
 def main():
     running: bool = True
+    # The tint used on the last frame, to know when the screen has to be redrawn
+    last_tint = None
+    # Whether the sidebar has to be drawn again, starting with the first frame
+    sidebar_dirty: bool = True
+    sidebar_rect = pygame.Rect(DRAWABLE_WIDTH, 0, SIDEBAR_AREA, HEIGHT)
+    clock = pygame.time.Clock()
 
     # Define sprites and game objects here, !outside the loop!
-    title: TextObject = TextObject(screen, Color.LIGHT_BLUE.value[0], (
+    title: TextObject = TextObject(screen, LIGHT_BLUE, (
         925, 25, 250, 100), "A* Pathfinder", DEFAULT_FONT, centered=(True, True))
 
     run_button: Button = Button(
-        screen, Color.GREEN.value[0], (935, 160, 230, 80), "Start", DEFAULT_FONT, board.run_pathfinding, centered=(True, True))
+        screen, GREEN, (935, 160, 230, 80), "Start", DEFAULT_FONT, board.run_pathfinding, centered=(True, True))
 
     reset_button: Button = Button(
-        screen, Color.GREEN.value[0], (935, 260, 230, 80), "Reset", DEFAULT_FONT, board.reset_board, centered=(True, True))
+        screen, GREEN, (935, 260, 230, 80), "Reset", DEFAULT_FONT, board.reset_board, centered=(True, True))
 
     place_start_button: Button = Button(
-        screen, Color.GREEN.value[0], (935, 360, 230, 80), "Place Start", DEFAULT_FONT, board.place_start, centered=(True, True))
+        screen, GREEN, (935, 360, 230, 80), "Place Start", DEFAULT_FONT, board.place_start, centered=(True, True))
 
     place_end_button: Button = Button(
-        screen, Color.GREEN.value[0], (935, 460, 230, 80), "Place End", DEFAULT_FONT, board.place_end, centered=(True, True))
+        screen, GREEN, (935, 460, 230, 80), "Place End", DEFAULT_FONT, board.place_end, centered=(True, True))
 
     remove_path_button: Button = Button(
-        screen, Color.GREEN.value[0], (935, 560, 230, 80), "Remove Paths", DEFAULT_FONT, board.remove_paths, centered=(True, True))
+        screen, GREEN, (935, 560, 230, 80), "Remove Paths", DEFAULT_FONT, board.remove_paths, centered=(True, True))
 
     diagonal_movement_toggle: Button = Button(
-        screen, Color.GREEN.value[0], (935, 660, 230, 80), "Diagonal Movement", DEFAULT_FONT, board.toggle_diagonal_movement, centered=(True, True))
+        screen, GREEN, (935, 660, 230, 80), "Diagonal Movement", DEFAULT_FONT, board.toggle_diagonal_movement, centered=(True, True))
 
     # Game Loop
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            # If the window was uncovered or restored, the display has to be repainted since only changes are sent to it
+            if event.type == pygame.WINDOWEXPOSED or event.type == pygame.VIDEOEXPOSE:
+                board.mark_all_dirty()
+                sidebar_dirty = True
+            # Only clicking and dragging can draw on the board
+            # Each event carries its own position and buttons, so a fast drag draws every cell it passed through in the frame
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                left_pressed = event.button == 1
+                right_pressed = event.button == 3
+            elif event.type == pygame.MOUSEMOTION:
+                left_pressed = bool(event.buttons[0])
+                right_pressed = bool(event.buttons[2])
+            else:
+                left_pressed, right_pressed = False, False
             # If left click is pressed
-            if pygame.mouse.get_pressed(3)[0]:
-                # Set the board to the current state of the board at the mouse pos
-                mouse_position = pygame.mouse.get_pos()
-                draw_success = board.draw_position(mouse_position,
+            if left_pressed:
+                # Set the board to the current state of the board at the event pos
+                draw_success = board.draw_position(event.pos,
                                                    board.get_state())
                 # If the position is drawn succesfully
                 if draw_success == 0:
                     board.placing_start, board.placing_end = False, False
             # If right click is pressed
-            if pygame.mouse.get_pressed(3)[2]:
-                # Turn the board off at the current mouse pos
-                board.erase(pygame.mouse.get_pos())
+            if right_pressed:
+                # Turn the board off at the event pos
+                board.erase(event.pos)
 
-            # For every button, check if it was clicked, and if it was, execute its callback
-            for button in Button.buttons:
-                if button.is_clicked(event):
-                    button.click()
+            # Only a left click can press a button, so only then check every button against the click position
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                for button in Button.buttons:
+                    if button.is_colliding(event.pos):
+                        button.click()
 
-        # Fill the background in
-        screen.fill(Color.LIGHT_BLUE.value[0])
-
-        # Draw the sidebar
-        pygame.draw.rect(
-            screen, Color.BLACK.value[0], (DRAWABLE_WIDTH, 0, SIDEBAR_AREA, HEIGHT))
-
-        # Update the cells
-        board.update_display(screen)
-
-        # Draw the cell-separating lines
-        board.draw_lines(screen, Color.BLACK.value[0])
-
-        if board.diagonal:
-            diagonal_movement_toggle.color = Color.GREEN.value[0]
+        # The overlay the screen is tinted with while placing the start or end, or None if nothing is being placed
+        if board.placing_start:
+            tint = START_TINT
+        elif board.placing_end:
+            tint = END_TINT
         else:
-            diagonal_movement_toggle.color = Color.RED.value[0]
-        # Render all objects
+            tint = None
+        # When the tint changes, everything has to be drawn again to add or remove it
+        if tint is not last_tint:
+            board.mark_all_dirty()
+            sidebar_dirty = True
+            last_tint = tint
+
+        # Update the cells that changed, keeping track of the parts of the screen that need updating
+        dirty_rects = board.update_display(screen)
+
+        # Draw the cell-separating lines back over the redrawn cells
+        screen.blits([(board.grid_overlay, rect, rect)
+                     for rect in dirty_rects], doreturn=False)
+
+        # Draw the sidebar, which everything on it has to be rendered on top of again
+        # Its rect already covers the objects on it, so theirs aren't added too, or the tint would be applied twice
+        sidebar_redrawn: bool = sidebar_dirty
+        if sidebar_dirty:
+            pygame.draw.rect(screen, BLACK, sidebar_rect)
+            for renderable_object in RenderedObject.renderable_objects:
+                renderable_object.needs_render = True
+            dirty_rects.append(sidebar_rect)
+            sidebar_dirty = False
+
+        diagonal_movement_toggle.set_color(GREEN if board.diagonal else RED)
+        # Render all objects that changed in one call
+        object_blits = []
         for renderable_object in RenderedObject.renderable_objects:
-            renderable_object.render()
-
-        # If the user is setting the starting position, tint the screen
-        if board.placing_start:
-            tmp = pygame.Surface(SIZE)
-            tmp.fill(BOARD_STATE_COLORS.START.value[0])
-            tmp.set_alpha(100)
-            screen.blit(tmp, (0, 0))
-
-        # If the user is placing start, tint the screen
-        if board.placing_end:
-            tmp = pygame.Surface(SIZE)
-            tmp.fill(BOARD_STATE_COLORS.END.value[0])
-            tmp.set_alpha(100)
-            screen.blit(tmp, (0, 0))
-
-        pygame.display.update()
+            if renderable_object.active and renderable_object.needs_render:
+                object_blits.extend(renderable_object.get_blits())
+                if not sidebar_redrawn:
+                    dirty_rects.append(pygame.Rect(renderable_object.rect))
+                renderable_object.needs_render = False
+        screen.blits(object_blits, doreturn=False)
+
+        # If the user is placing the start or end, tint everything that was redrawn
+        if tint is not None:
+            for rect in dirty_rects:
+                screen.blit(tint, rect, rect)
+
+        # Only the parts of the screen that changed are sent to the display, and nothing on idle frames
+        if len(dirty_rects) != 0:
+            pygame.display.update(dirty_rects)
+        clock.tick(FRAMES_PER_SECOND)
 
     pygame.quit()
     sys.exit()